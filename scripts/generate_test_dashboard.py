@@ -3,43 +3,65 @@
 Generate HTML dashboard for test quality metrics
 """
 
+import functools
+import heapq
 import json
+import operator
 import sys
 import os
 from datetime import datetime
+from html import escape
 from pathlib import Path
 
-def generate_dashboard(metrics_file, trend_file, output_file):
-    """Generate HTML dashboard from metrics data"""
-    
-    # Load data
-    with open(metrics_file, 'r') as f:
-        metrics = json.load(f)
-    
-    with open(trend_file, 'r') as f:
-        trends = json.load(f)
-    
-    # Extract key metrics
-    coverage = metrics['metrics']['coverage']['average']
-    quality_score = metrics['metrics']['quality_score']['overall']
-    test_count = metrics['metrics']['test_types']['total_test_files']
-    flaky_count = metrics['metrics']['flakiness']['flaky_test_count']
-    
-    # Generate trend data for charts
-    trend_labels = [t['timestamp'][:10] for t in trends[-10:]]
-    coverage_trend = [t.get('coverage', 0) for t in trends[-10:]]
-    quality_trend = [t.get('quality_score', 0) for t in trends[-10:]]
-    
-    # Generate HTML
-    html = f"""
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(o):
+        return orjson.dumps(o).decode()
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
+_PKG_PREFIX = 'github.com/bebsworthy/qualhook/'
+
+# (minimum score, color) pairs, highest threshold first; anything lower is red
+_SCORE_COLORS = ((80, '#4caf50'), (60, '#ff9800'))  # green, orange
+
+# Table row layouts shared by the row generators
+_ROW2_TPL = """
+            <tr>
+                <td>{}</td>
+                <td>{}</td>
+            </tr>
+        """
+
+_COVERAGE_ROW_TPL = """
+            <tr>
+                <td>{}</td>
+                <td style="color: {}">{:.1f}%{}</td>
+                <td>{}</td>
+            </tr>
+        """
+
+_DURATION_ROW_TPL = """
+            <tr>
+                <td>{}</td>
+                <td>{}</td>
+                <td style="color: {}">{:.3f}s</td>
+            </tr>
+        """
+
+# HTML layout, written section by section around the generated table rows.
+# Sections rendered with str.format_map use doubled literal braces.
+_DASHBOARD_HEAD = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Qualhook Test Quality Dashboard</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
+{chart_loader}    <style>
         body {{
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             margin: 0;
@@ -77,10 +99,10 @@ def generate_dashboard(metrics_file, trend_file, output_file):
             font-size: 14px;
         }}
         .quality-score {{
-            color: {get_score_color(quality_score)};
+            color: {quality_color};
         }}
         .coverage {{
-            color: {get_score_color(coverage)};
+            color: {coverage_color};
         }}
         .charts-grid {{
             display: grid;
@@ -150,11 +172,17 @@ def generate_dashboard(metrics_file, trend_file, output_file):
             </div>
             <div class="metric-card">
                 <div class="metric-label">Flaky Tests</div>
-                <div class="metric-value {get_flaky_class(flaky_count)}">{flaky_count}</div>
+                <div class="metric-value {flaky_class}">{flaky_count}</div>
             </div>
         </div>
         
-        <div class="charts-grid">
+"""
+
+# Trend charts are only written when there is trend history to plot
+_CHART_LOADER = """    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+"""
+
+_CHARTS_GRID = """        <div class="charts-grid">
             <div class="chart-container">
                 <h3>Coverage Trend</h3>
                 <canvas id="coverageTrend"></canvas>
@@ -165,7 +193,9 @@ def generate_dashboard(metrics_file, trend_file, output_file):
             </div>
         </div>
         
-        <div class="details">
+"""
+
+_PACKAGE_TABLE = """        <div class="details">
             <h3>Package Coverage</h3>
             <table>
                 <thead>
@@ -176,7 +206,9 @@ def generate_dashboard(metrics_file, trend_file, output_file):
                     </tr>
                 </thead>
                 <tbody>
-                    {generate_package_rows(metrics['metrics']['coverage']['by_package'])}
+"""
+
+_TEST_TYPES_TABLE = """
                 </tbody>
             </table>
         </div>
@@ -191,30 +223,34 @@ def generate_dashboard(metrics_file, trend_file, output_file):
                     </tr>
                 </thead>
                 <tbody>
-                    {generate_test_type_rows(metrics['metrics']['test_types'])}
+"""
+
+_TABLES_END = """
                 </tbody>
             </table>
         </div>
-        
-        {generate_flaky_tests_section(metrics['metrics']['flakiness'])}
-        
-        {generate_slow_tests_section(metrics['metrics']['execution_time'])}
-        
+"""
+
+_DASHBOARD_FOOT = """
         <div class="timestamp">
-            Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            Generated at: {generated_at}
         </div>
     </div>
     
-    <script>
+"""
+
+_CHARTS_SCRIPT = """    <script>
+        const trendLabels = {trend_labels};
+        
         // Coverage Trend Chart
         const coverageCtx = document.getElementById('coverageTrend').getContext('2d');
         new Chart(coverageCtx, {{
             type: 'line',
             data: {{
-                labels: {json.dumps(trend_labels)},
+                labels: trendLabels,
                 datasets: [{{
                     label: 'Coverage %',
-                    data: {json.dumps(coverage_trend)},
+                    data: {coverage_trend},
                     borderColor: 'rgb(75, 192, 192)',
                     backgroundColor: 'rgba(75, 192, 192, 0.2)',
                     tension: 0.1
@@ -236,10 +272,10 @@ def generate_dashboard(metrics_file, trend_file, output_file):
         new Chart(qualityCtx, {{
             type: 'line',
             data: {{
-                labels: {json.dumps(trend_labels)},
+                labels: trendLabels,
                 datasets: [{{
                     label: 'Quality Score',
-                    data: {json.dumps(quality_trend)},
+                    data: {quality_trend},
                     borderColor: 'rgb(54, 162, 235)',
                     backgroundColor: 'rgba(54, 162, 235, 0.2)',
                     tension: 0.1
@@ -256,24 +292,96 @@ def generate_dashboard(metrics_file, trend_file, output_file):
             }}
         }});
     </script>
-</body>
+"""
+
+_DASHBOARD_END = """</body>
 </html>
 """
+
+def _load_json(path):
+    """Load JSON data with orjson when available; cached until the file changes"""
+    st = os.stat(path)
+    return _load_json_cached(path, st.st_mtime_ns, st.st_size, st.st_ino)
+
+@functools.lru_cache(maxsize=8)
+def _load_json_cached(path, mtime_ns, size, ino):
+    """Parse a JSON file; the stat fields only key the cache. Callers must not mutate the result"""
+    return _loads(Path(path).read_bytes())
+
+def generate_dashboard(metrics_file, trend_file, output_file):
+    """Generate HTML dashboard from metrics data"""
+    
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    # Load data
+    metrics = _load_json(metrics_file)
+    trends = _load_json(trend_file)
     
-    # Write dashboard
-    with open(output_file, 'w') as f:
-        f.write(html)
+    # Extract key metrics; resolve every section up front so a malformed
+    # metrics file fails before any output is written
+    coverage_metrics = metrics['metrics']['coverage']
+    test_types = metrics['metrics']['test_types']
+    flakiness = metrics['metrics']['flakiness']
+    execution_time = metrics['metrics']['execution_time']
+    
+    coverage = coverage_metrics['average']
+    quality_score = metrics['metrics']['quality_score']['overall']
+    test_count = test_types['total_test_files']
+    flaky_count = flakiness['flaky_test_count']
+    
+    # Generate trend data for charts
+    trend_labels, coverage_trend, quality_trend = [], [], []
+    for t in trends[-10:]:
+        trend_labels.append(t['timestamp'][:10])
+        coverage_trend.append(t.get('coverage', 0))
+        quality_trend.append(t.get('quality_score', 0))
+    
+    context = {
+        'chart_loader': _CHART_LOADER if trend_labels else '',
+        'quality_score': quality_score,
+        'quality_color': get_score_color(quality_score),
+        'coverage': coverage,
+        'coverage_color': get_score_color(coverage),
+        'test_count': test_count,
+        'flaky_count': flaky_count,
+        'flaky_class': get_flaky_class(flaky_count),
+        'generated_at': generated_at,
+        'trend_labels': _dumps(trend_labels),
+        'coverage_trend': _dumps(coverage_trend),
+        'quality_trend': _dumps(quality_trend),
+    }
+    
+    # Write dashboard, streaming each section instead of building one string.
+    # Rows are rendered lazily, so write to a temporary file next to the
+    # output and only replace the existing dashboard once it is complete.
+    tmp_file = f"{output_file}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            f.write(_DASHBOARD_HEAD.format_map(context))
+            if trend_labels:
+                f.write(_CHARTS_GRID)
+            f.write(_PACKAGE_TABLE)
+            f.writelines(generate_package_rows(coverage_metrics['by_package']))
+            f.write(_TEST_TYPES_TABLE)
+            f.writelines(generate_test_type_rows(test_types))
+            f.write(_TABLES_END)
+            f.writelines(generate_flaky_tests_section(flakiness))
+            f.writelines(generate_slow_tests_section(execution_time))
+            f.write(_DASHBOARD_FOOT.format_map(context))
+            if trend_labels:
+                f.write(_CHARTS_SCRIPT.format_map(context))
+            f.write(_DASHBOARD_END)
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
     
     print(f"Dashboard generated: {output_file}")
 
 def get_score_color(score):
     """Get color based on score"""
-    if score >= 80:
-        return '#4caf50'  # green
-    elif score >= 60:
-        return '#ff9800'  # orange
-    else:
-        return '#f44336'  # red
+    return next((color for threshold, color in _SCORE_COLORS if score >= threshold), '#f44336')
 
 def get_flaky_class(count):
     """Get CSS class for flaky test count"""
@@ -284,25 +392,21 @@ def get_flaky_class(count):
     else:
         return 'error'
 
+def html_package_name(package):
+    """Strip the module prefix from a package path and escape it for HTML"""
+    return escape(package.removeprefix(_PKG_PREFIX))
+
 def generate_package_rows(packages):
     """Generate HTML rows for package coverage"""
-    rows = []
-    for pkg in sorted(packages, key=lambda x: x['coverage'], reverse=True)[:10]:
+    for pkg in heapq.nlargest(10, packages, key=operator.itemgetter('coverage')):
         coverage = pkg['coverage']
         color = get_score_color(coverage)
         error_indicator = ' ⚠️' if pkg.get('error') else ''
-        rows.append(f"""
-            <tr>
-                <td>{pkg['package'].replace('github.com/bebsworthy/qualhook/', '')}</td>
-                <td style="color: {color}">{coverage:.1f}%{error_indicator}</td>
-                <td>{pkg['test_files']}</td>
-            </tr>
-        """)
-    return ''.join(rows)
+        yield _COVERAGE_ROW_TPL.format(html_package_name(pkg['package']),
+                                       color, coverage, error_indicator, pkg['test_files'])
 
 def generate_test_type_rows(test_types):
     """Generate HTML rows for test type distribution"""
-    rows = []
     types = [
         ('Unit Tests', test_types['unit_test_files']),
         ('Integration Tests', test_types['integration_test_files']),
@@ -311,29 +415,14 @@ def generate_test_type_rows(test_types):
         ('Examples', test_types['example_files'])
     ]
     for name, count in types:
-        rows.append(f"""
-            <tr>
-                <td>{name}</td>
-                <td>{count}</td>
-            </tr>
-        """)
-    return ''.join(rows)
+        yield _ROW2_TPL.format(name, count)
 
 def generate_flaky_tests_section(flakiness):
     """Generate flaky tests section"""
     if flakiness['flaky_test_count'] == 0:
-        return ''
-    
-    rows = []
-    for test in flakiness['flaky_tests'][:10]:
-        rows.append(f"""
-            <tr>
-                <td>{test['test']}</td>
-                <td>{test['package'].replace('github.com/bebsworthy/qualhook/', '')}</td>
-            </tr>
-        """)
+        return
     
-    return f"""
+    yield """
         <div class="details">
             <h3>Flaky Tests</h3>
             <table>
@@ -344,7 +433,11 @@ def generate_flaky_tests_section(flakiness):
                     </tr>
                 </thead>
                 <tbody>
-                    {''.join(rows)}
+    """
+    for test in flakiness['flaky_tests'][:10]:
+        yield _ROW2_TPL.format(escape(test['test']), html_package_name(test['package']))
+    
+    yield """
                 </tbody>
             </table>
         </div>
@@ -354,21 +447,9 @@ def generate_slow_tests_section(execution_time):
     """Generate slow tests section"""
     slowest = execution_time.get('slowest_tests', [])
     if not slowest:
-        return ''
-    
-    rows = []
-    for test in slowest[:10]:
-        duration = test['duration']
-        color = '#f44336' if duration > 1.0 else '#ff9800' if duration > 0.5 else '#4caf50'
-        rows.append(f"""
-            <tr>
-                <td>{test['name']}</td>
-                <td>{test['package'].replace('github.com/bebsworthy/qualhook/', '')}</td>
-                <td style="color: {color}">{duration:.3f}s</td>
-            </tr>
-        """)
+        return
     
-    return f"""
+    yield """
         <div class="details">
             <h3>Slowest Tests</h3>
             <table>
@@ -380,7 +461,14 @@ def generate_slow_tests_section(execution_time):
                     </tr>
                 </thead>
                 <tbody>
-                    {''.join(rows)}
+    """
+    for test in slowest[:10]:
+        duration = test['duration']
+        color = '#f44336' if duration > 1.0 else '#ff9800' if duration > 0.5 else '#4caf50'
+        yield _DURATION_ROW_TPL.format(escape(test['name']), html_package_name(test['package']),
+                                       color, duration)
+    
+    yield """
                 </tbody>
             </table>
         </div>
@@ -3,34 +3,65 @@
 Visualize test quality trends over time
 """
 
+import functools
 import json
 import sys
 import os
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# fromisoformat accepts a trailing 'Z' from Python 3.11 onwards
+if sys.version_info >= (3, 11):
+    _parse_timestamp = datetime.fromisoformat
+else:
+    def _parse_timestamp(value):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def _load_json(path):
+    """Load JSON data with the stdlib parser, which is fast enough for trend files; cached until the file changes"""
+    st = os.stat(path)
+    return _load_json_cached(path, st.st_mtime_ns, st.st_size, st.st_ino)
+
+@functools.lru_cache(maxsize=8)
+def _load_json_cached(path, mtime_ns, size, ino):
+    """Parse a JSON file; the stat fields only key the cache. Callers must not mutate the result"""
+    return json.loads(Path(path).read_bytes())
+
+def _series(trends, key):
+    """Return one trend field as a float array, missing values counting as 0"""
+    return np.fromiter((t.get(key, 0) for t in trends), dtype=np.float64, count=len(trends))
+
 def visualize_trends(trend_file, output_dir):
     """Generate trend visualizations"""
     
+    # Imported here so summary-only runs work without matplotlib installed
+    import matplotlib
+    matplotlib.use('Agg')  # render off-screen; no GUI toolkit needed
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    
     # Create output directory
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
     # Load trend data
-    with open(trend_file, 'r') as f:
-        trends = json.load(f)
+    trends = _load_json(trend_file)
     
     if not trends:
         print("No trend data available")
         return
     
-    # Extract data
-    timestamps = [datetime.fromisoformat(t['timestamp'].replace('Z', '+00:00')) for t in trends]
-    coverage = [t.get('coverage', 0) for t in trends]
-    quality_scores = [t.get('quality_score', 0) for t in trends]
-    test_counts = [t.get('test_count', 0) for t in trends]
-    flaky_counts = [t.get('flaky_count', 0) for t in trends]
+    # Extract data into one contiguous array per series; dates are converted
+    # once so every subplot shares the same x array
+    timestamps = mdates.date2num([_parse_timestamp(t['timestamp']) for t in trends])
+    coverage = _series(trends, 'coverage')
+    quality_scores = _series(trends, 'quality_score')
+    test_counts = _series(trends, 'test_count')
+    flaky_counts = _series(trends, 'flaky_count')
     
     # Set up the plot style
     plt.style.use('seaborn-v0_8-darkgrid')
@@ -76,8 +107,9 @@ def visualize_trends(trend_file, output_dir):
     
     # Format x-axis for all subplots
     for ax in [ax1, ax2, ax3, ax4]:
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
     
     # Adjust layout
@@ -85,33 +117,42 @@ def visualize_trends(trend_file, output_dir):
     
     # Save the plot
     output_file = os.path.join(output_dir, 'test_quality_trends.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    fig.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close(fig)
     print(f"Trend visualization saved to: {output_file}")
     
     # Generate summary statistics
     generate_summary_stats(trends, output_dir)
 
+def _recent_stats(recent):
+    """Return average coverage/quality, max flaky count and latest coverage/quality deltas"""
+    if np is not None:
+        arr = np.array(recent, dtype=np.float64)
+        avg_coverage, avg_quality, _ = arr.mean(axis=0)
+        coverage_trend, quality_trend, _ = arr[-1] - arr[-2]
+        return avg_coverage, avg_quality, int(arr[:, 2].max()), coverage_trend, quality_trend
+    
+    coverages, qualities, flaky_counts = zip(*recent)
+    return (sum(coverages) / len(recent), sum(qualities) / len(recent), max(flaky_counts),
+            coverages[-1] - coverages[-2], qualities[-1] - qualities[-2])
+
 def generate_summary_stats(trends, output_dir):
     """Generate summary statistics"""
     
     if len(trends) < 2:
         return
     
-    # Calculate statistics
-    recent = trends[-7:]  # Last 7 data points
-    
-    avg_coverage = sum(t.get('coverage', 0) for t in recent) / len(recent)
-    avg_quality = sum(t.get('quality_score', 0) for t in recent) / len(recent)
-    max_flaky = max(t.get('flaky_count', 0) for t in recent)
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    # Calculate trends
-    coverage_trend = trends[-1].get('coverage', 0) - trends[-2].get('coverage', 0)
-    quality_trend = trends[-1].get('quality_score', 0) - trends[-2].get('quality_score', 0)
+    # Calculate statistics over the last 7 data points
+    recent = [(t.get('coverage', 0), t.get('quality_score', 0), t.get('flaky_count', 0))
+              for t in trends[-7:]]
+    avg_coverage, avg_quality, max_flaky, coverage_trend, quality_trend = _recent_stats(recent)
     
     # Generate summary report
     summary = f"""# Test Quality Summary Report
 
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Generated: {generated_at}
 
 ## 7-Day Averages
 - **Average Coverage**: {avg_coverage:.1f}%
@@ -168,8 +209,8 @@ if __name__ == '__main__':
         print("Generating text summary only...")
         
         # Load trend data for summary
-        with open(trend_file, 'r') as f:
-            trends = json.load(f)
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        trends = _load_json(trend_file)
         
         if trends:
             generate_summary_stats(trends, output_dir)
\ No newline at end of file